@@ -0,0 +1,70 @@
+import base64
+import binascii
+import re
+
+import filetype
+from django.core.files import File
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
+from rest_framework import serializers
+
+from core.constants import BASE64_CHUNK_SIZE
+
+WHITESPACE = re.compile(r'\s')
+
+
+class StreamingBase64ImageField(Base64ImageField):
+    """
+    Base64ImageField, декодирующий изображение во временный файл частями.
+    Декодированные байты не держатся в памяти целиком, а проверка
+    изображения читает его с диска.
+    """
+
+    def to_internal_value(self, base64_data):
+        if base64_data in self.EMPTY_VALUES or not isinstance(
+            base64_data, str
+        ):
+            return super().to_internal_value(base64_data)
+        file_mime_type = None
+        if ';base64,' in base64_data:
+            header, base64_data = base64_data.split(';base64,')
+            if self.trust_provided_content_type:
+                file_mime_type = header.replace('data:', '')
+        if WHITESPACE.search(base64_data):
+            base64_data = WHITESPACE.sub('', base64_data)
+        upload = TemporaryUploadedFile(
+            self.get_file_name(None), file_mime_type, 0, None
+        )
+        try:
+            for start in range(0, len(base64_data), BASE64_CHUNK_SIZE):
+                upload.size += upload.write(base64.b64decode(
+                    base64_data[start:start + BASE64_CHUNK_SIZE]
+                ))
+        except (binascii.Error, ValueError):
+            upload.close()
+            raise serializers.ValidationError(self.INVALID_FILE_MESSAGE)
+        upload.flush()
+        file_extension = self.get_file_extension(
+            upload.name, upload.temporary_file_path()
+        )
+        if file_extension not in self.ALLOWED_TYPES:
+            upload.close()
+            raise serializers.ValidationError(self.INVALID_TYPE_MESSAGE)
+        upload.name = f'{upload.name}.{file_extension}'
+        upload.seek(0)
+        serializers.ImageField.to_internal_value(self, upload)
+        # Хранилище скопирует файл частями, а временный файл удалится
+        # при закрытии, как и при ошибке валидации.
+        return File(upload.file, name=upload.name)
+
+    def get_file_extension(self, filename, file_path):
+        """Определяет расширение по файлу на диске, а не по байтам."""
+        extension = filetype.guess_extension(file_path)
+        if extension is None:
+            try:
+                with Image.open(file_path) as image:
+                    extension = image.format.lower()
+            except OSError:
+                raise serializers.ValidationError(self.INVALID_FILE_MESSAGE)
+        return 'jpg' if extension == 'jpeg' else extension
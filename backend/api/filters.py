@@ -1,16 +1,26 @@
 from django_filters import (
-    AllValuesMultipleFilter, CharFilter, FilterSet, NumberFilter,
+    BooleanFilter, CharFilter, FilterSet, ModelMultipleChoiceFilter,
+    NumberFilter,
 )
+from django_filters.widgets import BooleanWidget
 
-from recipes.models import Ingredient, Recipe
+from recipes.models import Ingredient, Recipe, Tag
 
 
 class RecipeFilter(FilterSet):
     """Фильтр выборки рецепта по определенным полям."""
     author = NumberFilter(field_name='author__id')
-    is_favorited = NumberFilter(method='filter_is_favorited')
-    is_in_shopping_cart = NumberFilter(method='filter_is_in_shopping_cart')
-    tags = AllValuesMultipleFilter(field_name='tags__slug')
+    is_favorited = BooleanFilter(
+        method='filter_is_favorited', widget=BooleanWidget()
+    )
+    is_in_shopping_cart = BooleanFilter(
+        method='filter_is_in_shopping_cart', widget=BooleanWidget()
+    )
+    tags = ModelMultipleChoiceFilter(
+        field_name='tags__slug',
+        to_field_name='slug',
+        queryset=Tag.objects.all()
+    )
 
     class Meta:
         model = Recipe
@@ -18,17 +28,11 @@ class RecipeFilter(FilterSet):
 
     def filter_is_favorited(self, queryset, name, value):
         """Фильтрация рецептов в избранном у текущего пользователя."""
-        user = self.request.user
-        if value and user.is_authenticated:
-            return queryset.filter(favorite_recipes__user=user)
-        return queryset
+        return queryset.filter(is_favorited=value)
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         """Фильтрация рецептов в корзине у текущего пользователя."""
-        user = self.request.user
-        if value and user.is_authenticated:
-            return queryset.filter(shopping_carts__user=user)
-        return queryset
+        return queryset.filter(is_in_shopping_cart=value)
 
 
 class IngredientFilterSet(FilterSet):
@@ -0,0 +1,47 @@
+from django.db.models import BooleanField, Exists, OuterRef, Value
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_page
+
+from core.constants import REFERENCE_CACHE_TIMEOUT
+from users.models import Follow
+
+
+class SubscribedAnnotationMixin:
+    """Аннотирует пользователей признаком подписки текущего пользователя."""
+
+    def annotate_is_subscribed(self, queryset):
+        """Добавляет is_subscribed в queryset пользователей одним запросом."""
+        user = self.request.user
+        if user.is_authenticated:
+            return queryset.annotate(
+                is_subscribed=Exists(
+                    Follow.objects.filter(user=user, following=OuterRef('pk'))
+                )
+            )
+        return queryset.annotate(
+            is_subscribed=Value(False, output_field=BooleanField())
+        )
+
+
+class OptionalFilterMixin:
+    """Пропускает построение FilterSet, если фильтры не переданы."""
+
+    def filter_queryset(self, queryset):
+        if not any(
+            name in self.request.query_params
+            for name in self.filterset_class.base_filters
+        ):
+            return queryset
+        return super().filter_queryset(queryset)
+
+
+class CachedReadOnlyMixin:
+    """Кэширует ответы list и retrieve редко меняющихся справочников."""
+
+    @method_decorator(cache_page(REFERENCE_CACHE_TIMEOUT))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(cache_page(REFERENCE_CACHE_TIMEOUT))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -1,9 +1,14 @@
 from rest_framework.pagination import PageNumberPagination
 
-from core.constants import DEFAULT_PAGE_SIZE
+from core.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 class CustomPagination(PageNumberPagination):
-    """Кастомная пагинация выдачи результатов."""
+    """
+    Кастомная пагинация выдачи результатов.
+    Фронтенд работает с номерами страниц, поэтому размер страницы
+    ограничен сверху, чтобы не выбирать из БД слишком много строк.
+    """
     page_size = DEFAULT_PAGE_SIZE
     page_size_query_param = 'limit'
+    max_page_size = MAX_PAGE_SIZE
@@ -8,7 +8,8 @@ class IsAuthorAdminOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
     """
 
     def has_object_permission(self, request, view, obj):
-        return (
-            request.method in permissions.SAFE_METHODS
-            or request.user == obj.author
-        )
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        if not request.user.is_authenticated:
+            return False
+        return request.user.is_superuser or request.user == obj.author
@@ -1,12 +1,11 @@
 from django.contrib.auth import get_user_model
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
-from rest_framework.validators import UniqueTogetherValidator
 
-from recipes.models import (
-    FavoriteRecipe, Ingredient, Recipe, RecipeIngredient, ShoppingCart, Tag
-)
-from users.models import Follow
+from api.fields import StreamingBase64ImageField
+from api.utils import get_recipes_limit
+from core.constants import INGREDIENT_BATCH_SIZE
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
 
 User = get_user_model()
 
@@ -17,12 +16,20 @@ class RecipeShortSerializer(serializers.ModelSerializer):
         model = Recipe
         fields = ('id', 'name', 'image', 'cooking_time')
 
+    def to_representation(self, instance):
+        """Собираем представление напрямую, без обхода всех полей."""
+        return {
+            'id': instance.id,
+            'name': instance.name,
+            'image': self.fields['image'].to_representation(instance.image),
+            'cooking_time': instance.cooking_time,
+        }
+
 
 class UsersSerializer(serializers.ModelSerializer):
     """Сериализатор для модели User."""
     avatar = Base64ImageField(required=False, allow_null=True)
-    is_subscribed = serializers.SerializerMethodField(
-        default=False, read_only=True)
+    is_subscribed = serializers.BooleanField(read_only=True, default=False)
 
     class Meta:
         model = User
@@ -31,37 +38,26 @@ class UsersSerializer(serializers.ModelSerializer):
             'is_subscribed', 'avatar'
         )
 
-    def get_is_subscribed(self, obj):
-        """Выявляем подписан ли текущий пользователь на просматриваемого."""
-        request = self.context.get('request')
-        return (
-            request
-            and request.user.is_authenticated
-            and request.user.followers.filter(following=obj).exists()
-        )
-
 
 class UpdateAvatarSerializer(serializers.ModelSerializer):
     """Сериализатор обновления Аватара."""
-    avatar = Base64ImageField(required=True, allow_null=False)
+    avatar = StreamingBase64ImageField(required=True, allow_null=False)
 
     class Meta:
         model = User
         fields = ('avatar',)
 
     def update(self, instance, validated_data):
-        """Обновляем Аватар."""
+        """Обновляет только колонку аватара, а не всю строку пользователя."""
         instance.avatar = validated_data['avatar']
-        instance.save()
+        instance.save(update_fields=('avatar',))
         return instance
 
 
 class UserRecipeSerializer(UsersSerializer):
     """Сериализатор модели Пользователь."""
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.IntegerField(
-        read_only=True, source='recipes.count'
-    )
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = User
@@ -69,46 +65,17 @@ class UserRecipeSerializer(UsersSerializer):
 
     def get_recipes(self, obj):
         """Возвращает рецепты пользователя."""
-        request = self.context.get('request')
-        recipes_limit = request.query_params.get('recipes_limit', None)
-        recipes = obj.recipes.all()
-        if recipes_limit:
-            try:
-                recipes = recipes[:int(recipes_limit)]
-            except (ValueError, TypeError):
-                pass
+        recipes_limit = get_recipes_limit(self.context.get('request'))
+        recipes = getattr(obj, 'prefetched_recipes', None)
+        if recipes is None:
+            recipes = obj.recipes.all()
+        if recipes_limit is not None:
+            recipes = recipes[:recipes_limit]
         return RecipeShortSerializer(
             recipes, many=True, context=self.context
         ).data
 
 
-class FollowSerializer(serializers.ModelSerializer):
-    """Сериализатор модели Подписчики."""
-    class Meta:
-        model = Follow
-        fields = ('user', 'following')
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Follow.objects.all(),
-                fields=['user', 'following'],
-                message='Вы уже подписаны на этого пользователя.'
-            )
-        ]
-
-    def validate(self, attrs):
-        if self.context['request'].user == attrs.get('following'):
-            raise serializers.ValidationError(
-                'Нельзя подписаться на самого себя.'
-            )
-        return attrs
-
-    def to_representation(self, instance):
-        """Представление рецептов подписчика в ответе."""
-        return UserRecipeSerializer(
-            instance.following, context=self.context
-        ).data
-
-
 class TagSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Tag."""
 
@@ -151,12 +118,14 @@ class RecipeSerializer(serializers.ModelSerializer):
     """Сериализатор для отображения рецептов."""
     tags = TagSerializer(many=True)
     author = UsersSerializer()
-    image = Base64ImageField()
+    image = serializers.ImageField(read_only=True)
     ingredients = RecipeIngredientSerializer(
         many=True, source='recipe_ingredients'
     )
-    is_favorited = serializers.BooleanField(default=False)
-    is_in_shopping_cart = serializers.BooleanField(default=False)
+    is_favorited = serializers.BooleanField(read_only=True, default=False)
+    is_in_shopping_cart = serializers.BooleanField(
+        read_only=True, default=False
+    )
 
     class Meta:
         model = Recipe
@@ -165,7 +134,7 @@ class RecipeSerializer(serializers.ModelSerializer):
             'is_favorited', 'is_in_shopping_cart',
             'name', 'image', 'text', 'cooking_time'
         )
-        read_only_fields = ('author', 'is_favorited', 'is_in_shopping_cart')
+        read_only_fields = ('author',)
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
@@ -174,7 +143,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         queryset=Tag.objects.all(), many=True
     )
     ingredients = IngredientAmountSerializer(many=True)
-    image = Base64ImageField()
+    image = StreamingBase64ImageField()
 
     class Meta:
         model = Recipe
@@ -197,18 +166,22 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         if not tags:
             raise serializers.ValidationError(
                 'Необходимо выбрать минимум один тег.')
-        if len(tags) != len(set(tags)):
-            raise serializers.ValidationError('Теги должны быть уникальными.')
+        tag_ids = set()
+        for tag in tags:
+            if tag.id in tag_ids:
+                raise serializers.ValidationError(
+                    'Теги должны быть уникальными.')
+            tag_ids.add(tag.id)
         ingredients = data.get('ingredients')
         if not ingredients:
             raise serializers.ValidationError(
                 'Необходимо выбрать минимум один ингредиент.')
-        ingredient_ids = (
-            [ingredient['ingredient'].id for ingredient in ingredients]
-        )
-        if len(ingredient_ids) != len(set(ingredient_ids)):
-            raise serializers.ValidationError(
-                'Ингредиенты должны быть уникальными.')
+        ingredient_ids = set()
+        for ingredient in ingredients:
+            if ingredient['ingredient'].id in ingredient_ids:
+                raise serializers.ValidationError(
+                    'Ингредиенты должны быть уникальными.')
+            ingredient_ids.add(ingredient['ingredient'].id)
         return data
 
     def create(self, validated_data):
@@ -222,11 +195,8 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         """Обновляем рецепт."""
-        tags = validated_data.pop('tags')
-        ingredients = validated_data.pop('ingredients')
-        instance.ingredients.clear()
-        instance.tags.clear()
-        self.add_tags_ingredients_to_recipe(instance, tags, ingredients)
+        instance.tags.set(validated_data.pop('tags'))
+        self.update_ingredients(instance, validated_data.pop('ingredients'))
         super().update(instance, validated_data)
         return instance
 
@@ -240,49 +210,40 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 ingredient=ingredient['ingredient'],
                 amount=ingredient['amount']
             ) for ingredient in ingredients
-        ])
+        ], batch_size=INGREDIENT_BATCH_SIZE)
 
-    def to_representation(self, instance):
-        """Представление рецепта в ответе."""
-        return RecipeSerializer(instance, context=self.context).data
-
-
-class ShoppingCartFavoriteSerializer(serializers.ModelSerializer):
-    """Базовый сериализатор для добавления рецептов в корзину или избранное."""
-
-    class Meta:
-        fields = ('user', 'recipe')
-        validators = [
-            UniqueTogetherValidator(
-                queryset=None,
-                fields=['user', 'recipe'],
-                message='Вы уже добавили этот рецепт.'
-            )
-        ]
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.Meta.validators[0].queryset = self.get_queryset()
+    @staticmethod
+    def update_ingredients(recipe, ingredients):
+        """Обновляем только изменившиеся ингредиенты рецепта."""
+        current = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in recipe.recipe_ingredients.all()
+        }
+        amounts = {
+            ingredient['ingredient'].id: ingredient['amount']
+            for ingredient in ingredients
+        }
+        removed_ids = current.keys() - amounts.keys()
+        if removed_ids:
+            recipe.recipe_ingredients.filter(
+                ingredient_id__in=removed_ids
+            ).delete()
+        changed = []
+        for ingredient_id, recipe_ingredient in current.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and amount != recipe_ingredient.amount:
+                recipe_ingredient.amount = amount
+                changed.append(recipe_ingredient)
+        RecipeIngredient.objects.bulk_update(
+            changed, ['amount'], batch_size=INGREDIENT_BATCH_SIZE
+        )
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(
+                recipe=recipe, ingredient_id=ingredient_id, amount=amount
+            ) for ingredient_id, amount in amounts.items()
+            if ingredient_id not in current
+        ], batch_size=INGREDIENT_BATCH_SIZE)
 
     def to_representation(self, instance):
         """Представление рецепта в ответе."""
-        return RecipeShortSerializer(
-            instance.recipe, context=self.context).data
-
-
-class ShoppingCartSerializer(ShoppingCartFavoriteSerializer):
-    """Сериализатор для списка покупок."""
-    class Meta(ShoppingCartFavoriteSerializer.Meta):
-        model = ShoppingCart
-
-    def get_queryset(self):
-        return ShoppingCart.objects.all()
-
-
-class FavoriteRecipeSerializer(ShoppingCartFavoriteSerializer):
-    """Сериализатор для подписчиков."""
-    class Meta(ShoppingCartFavoriteSerializer.Meta):
-        model = FavoriteRecipe
-
-    def get_queryset(self):
-        return FavoriteRecipe.objects.all()
+        return RecipeSerializer(instance, context=self.context).data
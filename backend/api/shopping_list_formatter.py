@@ -1,18 +1,16 @@
 from datetime import datetime
 
+SHOPPING_LIST_LINE = '{:<20} {:<10} {:>5}\n'
+
 
 def format_shopping_list(ingredients):
-    """Функция для форматирования списка покупок."""
-    shopping_list = []
-    shopping_list.append('== Ваш список покупок ==\n')
+    """Генератор строк списка покупок для потоковой отдачи файла."""
+    created_at = datetime.now().strftime('%d-%m-%Y %H:%M')
+    yield '== Ваш список покупок ==\n\n'
     for ingredient in ingredients:
-        shopping_list.append(
-            '{:<20} {:<10} {:>5}'.format(
-                ingredient['name'],
-                f"({ingredient['measurement_unit']})",
-                ingredient['amount'],
-            )
+        yield SHOPPING_LIST_LINE.format(
+            ingredient['name'],
+            f"({ingredient['measurement_unit']})",
+            ingredient['amount'],
         )
-    shopping_list.append(
-        f"Список создан: {datetime.now().strftime('%d-%m-%Y %H:%M')}")
-    return '\n'.join(shopping_list)
+    yield f'Список создан: {created_at}'
@@ -0,0 +1,11 @@
+def get_recipes_limit(request):
+    """
+    Возвращает recipes_limit из запроса как неотрицательное число.
+    Для отсутствующего, нечислового или отрицательного значения
+    возвращает None, то есть рецепты не ограничиваются.
+    """
+    try:
+        recipes_limit = int(request.query_params.get('recipes_limit'))
+    except (TypeError, ValueError):
+        return None
+    return recipes_limit if recipes_limit >= 0 else None
@@ -1,5 +1,6 @@
-from django.db.models import Exists, F, OuterRef, Sum
-from django.http import HttpResponse
+from django.core.cache import cache
+from django.db.models import BooleanField, Count, F, Prefetch, Sum, Value
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
@@ -9,27 +10,39 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
 from api.filters import IngredientFilterSet, RecipeFilter
+from api.mixins import (
+    CachedReadOnlyMixin, OptionalFilterMixin, SubscribedAnnotationMixin,
+)
 from api.pagination import CustomPagination
 from api.permissions import IsAuthorAdminOrReadOnly
 from api.serializers import (
-    FavoriteRecipeSerializer, FollowSerializer, IngredientSerializer,
-    RecipeCreateSerializer, RecipeSerializer, ShoppingCartSerializer,
-    TagSerializer, UpdateAvatarSerializer, UsersSerializer,
+    IngredientSerializer, RecipeCreateSerializer, RecipeSerializer,
+    RecipeShortSerializer, TagSerializer, UpdateAvatarSerializer,
+    UserRecipeSerializer, UsersSerializer,
 )
 from api.shopping_list_formatter import format_shopping_list
-from recipes.models import (
-    FavoriteRecipe, Ingredient, Recipe, ShoppingCart, Tag,
-)
+from api.utils import get_recipes_limit
+from core.constants import SHORT_LINK_CACHE_KEY, SHORT_LINK_CACHE_TIMEOUT
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
 from users.models import User
 
 
-class UsersViewSet(UserViewSet):
+class UsersViewSet(SubscribedAnnotationMixin, UserViewSet):
     """Вьюсет для работы с пользователями."""
     queryset = User.objects.all()
     serializer_class = UsersSerializer
     permission_classes = (AllowAny,)
     pagination_class = CustomPagination
 
+    def get_queryset(self):
+        """Переопределение queryset с аннотацией подписки."""
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(
+                'id', 'email', 'username', 'first_name', 'last_name', 'avatar'
+            )
+        return self.annotate_is_subscribed(queryset)
+
     @action(
         methods=('get',),
         detail=False,
@@ -56,8 +69,8 @@ class UsersViewSet(UserViewSet):
     @avatar.mapping.delete
     def delete_avatar(self, request):
         user = self.request.user
-        user.avatar.delete()
-        user.save()
+        user.avatar.delete(save=False)
+        user.save(update_fields=('avatar',))
         return Response(
             {'detail': 'Аватар успешно удален.'},
             status=status.HTTP_204_NO_CONTENT
@@ -70,8 +83,25 @@ class UsersViewSet(UserViewSet):
     )
     def subscriptions(self, request):
         """Возвращает список подписок текущего пользователя с рецептами."""
-        page = self.paginate_queryset(request.user.following.all())
-        serializer = FollowSerializer(
+        recipes = Recipe.objects.only(
+            'id', 'name', 'image', 'cooking_time', 'author'
+        )
+        recipes_limit = get_recipes_limit(request)
+        if recipes_limit is not None:
+            # Срез в Prefetch ограничивает число рецептов каждого автора
+            # прямо в БД, а не после загрузки всех рецептов.
+            recipes = recipes[:recipes_limit]
+        users = self.annotate_is_subscribed(
+            User.objects.filter(followers__user=request.user)
+        ).annotate(
+            recipes_count=Count('recipes')
+        ).order_by('username').prefetch_related(
+            Prefetch(
+                'recipes', queryset=recipes, to_attr='prefetched_recipes'
+            )
+        )
+        page = self.paginate_queryset(users)
+        serializer = UserRecipeSerializer(
             page, many=True, context={'request': request}
         )
         return self.get_paginated_response(serializer.data)
@@ -83,21 +113,36 @@ class UsersViewSet(UserViewSet):
     )
     def subscribe(self, request, id=None):
         user = self.request.user
-        following = get_object_or_404(User, id=id)
-        serializer = FollowSerializer(
-            data={'user': user.id, 'following': following.id},
-            context={'request': request}
+        # Ответ отдается только после создания подписки на автора.
+        following = get_object_or_404(
+            User.objects.annotate(
+                recipes_count=Count('recipes'),
+                is_subscribed=Value(True, output_field=BooleanField())
+            ),
+            id=id
+        )
+        if user == following:
+            return Response(
+                {'detail': 'Нельзя подписаться на самого себя.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        _, created = user.following.get_or_create(following=following)
+        if not created:
+            return Response(
+                {'detail': 'Вы уже подписаны на этого пользователя.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            UserRecipeSerializer(following, context={'request': request}).data,
+            status=status.HTTP_201_CREATED
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @subscribe.mapping.delete
     def delete_subscribe(self, request, id=None):
         user = self.request.user
-        following = get_object_or_404(User, id=id)
-        deleted, _ = user.following.filter(following=following).delete()
+        deleted, _ = user.following.filter(following_id=id).delete()
         if not deleted:
+            get_object_or_404(User.objects.only('id'), id=id)
             return Response(
                 {'detail': 'Вы не подписаны на этого пользователя.'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -107,14 +152,16 @@ class UsersViewSet(UserViewSet):
         )
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedReadOnlyMixin, viewsets.ReadOnlyModelViewSet):
     """Вьюсет Тегов."""
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AllowAny,)
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(
+    OptionalFilterMixin, CachedReadOnlyMixin, viewsets.ReadOnlyModelViewSet
+):
     """Вьюсет Ингредиентов."""
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
@@ -123,7 +170,9 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_class = IngredientFilterSet
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    OptionalFilterMixin, SubscribedAnnotationMixin, viewsets.ModelViewSet
+):
     """Вьюсет Рецептов."""
     permission_classes = (AllowAny,)
     filter_backends = (DjangoFilterBackend,)
@@ -143,23 +192,24 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return RecipeCreateSerializer
 
     def get_queryset(self):
-        """Переопределение queryset с предвыборкой избранных и корзины."""
-        user = self.request.user
-        queryset = Recipe.objects.all()
-        if user.is_authenticated:
-            queryset = queryset.annotate(
-                is_favorited=Exists(
-                    FavoriteRecipe.objects.filter(
-                        user=user, recipe=OuterRef('pk')
-                    )
-                ),
-                is_in_shopping_cart=Exists(
-                    ShoppingCart.objects.filter(
-                        user=user, recipe=OuterRef('pk')
-                    )
-                )
-            )
-        return queryset
+        """
+        Переопределение queryset с аннотацией избранного и корзины.
+        RecipeSerializer читает is_favorited и is_in_shopping_cart
+        из аннотаций with_favorite_flags.
+        """
+        if self.action == 'short_url':
+            # Для короткой ссылки нужен только код, связи не загружаем.
+            return Recipe.objects.only('id', 'short_link_code')
+        if self.action not in (
+            'list', 'retrieve', 'update', 'partial_update'
+        ):
+            return Recipe.objects.all()
+        queryset = Recipe.objects.with_details(
+            authors=self.annotate_is_subscribed(User.objects.all())
+        )
+        if self.action == 'list':
+            queryset = queryset.for_list()
+        return queryset.with_favorite_flags(self.request.user)
 
     @action(methods=['get'], detail=True, url_path='get-link')
     def short_url(self, request, pk=None):
@@ -176,19 +226,53 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
     def download_shopping_cart(self, request):
         ingredients = (
-            Ingredient.objects
-            .filter(recipes__shopping_carts__user=request.user)
-            .values('name', 'measurement_unit')
-            .annotate(amount=Sum(F('recipe_ingredients__amount')))
+            RecipeIngredient.objects
+            .filter(recipe__shopping_carts__user=request.user)
+            .values(
+                name=F('ingredient__name'),
+                measurement_unit=F('ingredient__measurement_unit'),
+            )
+            .annotate(amount=Sum('amount'))
             .order_by('name')
         )
-        content = format_shopping_list(ingredients)
-        response = HttpResponse(content, content_type='text/plain')
+        response = StreamingHttpResponse(
+            format_shopping_list(ingredients.iterator(chunk_size=1000)),
+            content_type='text/plain; charset=utf-8'
+        )
         response['Content-Disposition'] = (
             'attachment; filename="shopping_list.txt"'
         )
         return response
 
+    @staticmethod
+    def add_recipe_relation(request, relations, pk, error):
+        """Добавляет рецепт в избранное или корзину пользователя."""
+        recipe = get_object_or_404(
+            Recipe.objects.only('id', 'name', 'image', 'cooking_time'), id=pk
+        )
+        _, created = relations.get_or_create(recipe=recipe)
+        if not created:
+            return Response(
+                {'detail': error}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            RecipeShortSerializer(recipe, context={'request': request}).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @staticmethod
+    def remove_recipe_relation(relations, pk, error, success):
+        """Удаляет рецепт из избранного или корзины пользователя."""
+        deleted, _ = relations.filter(recipe_id=pk).delete()
+        if not deleted:
+            get_object_or_404(Recipe.objects.only('id'), id=pk)
+            return Response(
+                {'detail': error}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            {'detail': success}, status=status.HTTP_204_NO_CONTENT
+        )
+
     @action(
         methods=['post'],
         detail=True,
@@ -196,29 +280,19 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
     def shopping_cart(self, request, pk=None):
         """Добавить рецепт в корзину."""
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=pk)
-        serializer = ShoppingCartSerializer(
-            data={'user': user.id, 'recipe': recipe.id}
+        return self.add_recipe_relation(
+            request, request.user.shopping_carts, pk,
+            'Вы уже добавили этот рецепт.'
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @shopping_cart.mapping.delete
     def delete_shopping_cart(self, request, pk=None):
         """Удалить рецепт из корзины."""
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=pk)
-        deleted, _ = user.shopping_carts.filter(recipe=recipe).delete()
-        if not deleted:
-            return Response(
-                {'detail': 'Рецепт не найден в корзине.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        return Response(
-            {'detail': 'Рецепт успешно удален из корзины.'},
-            status=status.HTTP_204_NO_CONTENT)
+        return self.remove_recipe_relation(
+            request.user.shopping_carts, pk,
+            'Рецепт не найден в корзине.',
+            'Рецепт успешно удален из корзины.'
+        )
 
     @action(
         methods=['post'],
@@ -227,32 +301,28 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
     def favorite(self, request, pk=None):
         """Добавить рецепт в избранное."""
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=pk)
-        serializer = FavoriteRecipeSerializer(
-            data={'user': user.id, 'recipe': recipe.id}
+        return self.add_recipe_relation(
+            request, request.user.favorite_recipes, pk,
+            'Вы уже добавили этот рецепт.'
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @favorite.mapping.delete
     def delete_favorite(self, request, pk=None):
         """Удалить рецепт из избранного."""
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=pk)
-        deleted, _ = user.favorite_recipes.filter(recipe=recipe).delete()
-        if not deleted:
-            return Response(
-                {'detail': 'Рецепт не найден в избранном.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        return Response(
-            {'detail': 'Рецепт успешно удален из избранного.'},
-            status=status.HTTP_204_NO_CONTENT)
+        return self.remove_recipe_relation(
+            request.user.favorite_recipes, pk,
+            'Рецепт не найден в избранном.',
+            'Рецепт успешно удален из избранного.'
+        )
 
 
 def redirect_short_url(request, short_link):
     """Перенаправление по короткой ссылке на рецепт."""
-    recipe = get_object_or_404(Recipe, short_link_code=short_link)
-    return redirect(f'/recipes/{recipe.id}/')
+    cache_key = SHORT_LINK_CACHE_KEY.format(short_link)
+    recipe_id = cache.get(cache_key)
+    if recipe_id is None:
+        recipe_id = get_object_or_404(
+            Recipe.objects.only('id'), short_link_code=short_link
+        ).id
+        cache.set(cache_key, recipe_id, SHORT_LINK_CACHE_TIMEOUT)
+    return redirect(f'/recipes/{recipe_id}/')
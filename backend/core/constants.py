@@ -1,15 +1,25 @@
 LENGTH_NAME = 150
 
 DEFAULT_PAGE_SIZE = 6
+MAX_PAGE_SIZE = 100
 
 COOKING_MIN_TIME = 1
 COOKING_MAX_TIME = 32000
 INGREDIENT_MIN_AMOUNT = 1
 INGREDIENT_MAX_AMOUNT = 32000
+INGREDIENT_BATCH_SIZE = 500
 RECIPE_LENGTH = 256
 INGREDIENT_LENGTH = 128
 MEASUREMENT_LENGTH = 64
 TAG_NAME = 32
 SHORT_LINK_CODE_LENGTH = 6
+BASE62_ALPHABET = (
+    '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+)
+BASE64_CHUNK_SIZE = 64 * 1024
 
-RESTRICTED_USERNAME = ['me', 'set_password', 'subscriptions']
+RESTRICTED_USERNAME = frozenset({'me', 'set_password', 'subscriptions'})
+
+REFERENCE_CACHE_TIMEOUT = 60 * 60
+SHORT_LINK_CACHE_KEY = 'shortlink:{}'
+SHORT_LINK_CACHE_TIMEOUT = 60 * 60
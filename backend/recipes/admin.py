@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 
 from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
 
@@ -9,6 +10,11 @@ class RecipeIngredientInline(admin.TabularInline):
     extra = 1
     min_num = 1
     fields = ('ingredient', 'amount')
+    autocomplete_fields = ('ingredient',)
+
+    def get_queryset(self, request):
+        """Ингредиент нужен для __str__ каждой строки inline."""
+        return super().get_queryset(request).select_related('ingredient')
 
 
 @admin.register(Ingredient)
@@ -17,6 +23,8 @@ class IngredientAdmin(admin.ModelAdmin):
     list_display = ('name', 'measurement_unit')
     list_editable = ('measurement_unit',)
     search_fields = ('name',)
+    ordering = ('name',)
+    list_per_page = 50
 
 
 @admin.register(Tag)
@@ -33,8 +41,17 @@ class RecipeAdmin(admin.ModelAdmin):
     list_editable = ('author',)
     search_fields = ('name', 'author__username')
     list_filter = ('tags',)
+    list_select_related = ('author',)
+    autocomplete_fields = ('author',)
+    list_per_page = 50
     inlines = [RecipeIngredientInline]
 
-    @admin.display(description='Сохранений')
+    def get_queryset(self, request):
+        """Число сохранений считается одним запросом для всей страницы."""
+        return super().get_queryset(request).annotate(
+            favorite_count=Count('favorite_recipes')
+        )
+
+    @admin.display(description='Сохранений', ordering='favorite_count')
     def get_favorite_count(self, obj):
-        return obj.favorite_recipes.count()
+        return obj.favorite_count
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+INDEX_NAME = 'ingredient_name_upper_idx'
+
+
+def create_index(apps, schema_editor):
+    """
+    Индекс под поиск ингредиентов по istartswith.
+    В PostgreSQL istartswith превращается в UPPER(name::text) LIKE 'X%',
+    такой запрос использует только функциональный индекс
+    с text_pattern_ops, поэтому на других СУБД он не создается.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} '
+        'ON recipes_ingredient (UPPER(name::text) text_pattern_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_recipe_pub_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-15 01:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_ingredient_name_upper_idx'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='recipe',
+            constraint=models.CheckConstraint(check=models.Q(('cooking_time__range', (1, 32000))), name='recipe_cooking_time_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipeingredient',
+            constraint=models.CheckConstraint(check=models.Q(('amount__range', (1, 32000))), name='recipe_ingredient_amount_range'),
+        ),
+    ]
@@ -1,10 +1,11 @@
-import uuid
-
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import (
+    BooleanField, Exists, OuterRef, Prefetch, Q, Value,
+)
 
 from core.constants import (
-    COOKING_MAX_TIME, COOKING_MIN_TIME, INGREDIENT_LENGTH,
+    BASE62_ALPHABET, COOKING_MAX_TIME, COOKING_MIN_TIME, INGREDIENT_LENGTH,
     INGREDIENT_MAX_AMOUNT, INGREDIENT_MIN_AMOUNT, MEASUREMENT_LENGTH,
     RECIPE_LENGTH, SHORT_LINK_CODE_LENGTH, TAG_NAME,
 )
@@ -55,6 +56,54 @@ class Tag(models.Model):
         return f'Тег - {self.name} (slug: {self.slug})'
 
 
+class RecipeQuerySet(models.QuerySet):
+    """QuerySet рецептов с выборкой данных для сериализации."""
+
+    def with_details(self, authors=None):
+        """
+        Подгружает автора, теги и ингредиенты рецептов.
+        Если передан queryset authors, автор подгружается через него,
+        например, чтобы получить аннотации пользователя.
+        """
+        if authors is None:
+            queryset = self.select_related('author')
+        else:
+            queryset = self.prefetch_related(
+                Prefetch('author', queryset=authors)
+            )
+        return queryset.prefetch_related(
+            'tags',
+            Prefetch(
+                'recipe_ingredients',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            )
+        )
+
+    def for_list(self):
+        """Оставляет только колонки, которые выводятся в списке рецептов."""
+        return self.only(
+            'id', 'name', 'image', 'text', 'cooking_time', 'author'
+        )
+
+    def with_favorite_flags(self, user):
+        """Аннотирует рецепты признаками is_favorited и is_in_shopping_cart."""
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField())
+            )
+        return self.annotate(
+            is_favorited=Exists(
+                FavoriteRecipe.objects.filter(
+                    user=user, recipe=OuterRef('pk')
+                )
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef('pk'))
+            )
+        )
+
+
 class Recipe(models.Model):
     """Модель Рецепта."""
     name = models.CharField('Название', max_length=RECIPE_LENGTH)
@@ -96,25 +145,48 @@ class Recipe(models.Model):
         blank=True, null=True, unique=True
     )
 
+    objects = RecipeQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ['-pub_date']
+        constraints = [
+            models.CheckConstraint(
+                check=Q(cooking_time__range=(
+                    COOKING_MIN_TIME, COOKING_MAX_TIME
+                )),
+                name='recipe_cooking_time_range'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['-pub_date'], name='recipe_pub_date_idx'),
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='recipe_author_pub_date_idx'
+            )
+        ]
 
-    def generate_short_link_code(self):
-        """Генерация короткого кода для рецепта."""
-        existing_codes = set(
-            Recipe.objects.values_list('short_link_code', flat=True)
-        )
-        short_code = uuid.uuid4().hex[:3]
-        while short_code in existing_codes:
-            short_code = uuid.uuid4().hex[:4]
-        return short_code
+    @staticmethod
+    def generate_short_link_code(pk):
+        """
+        Генерация короткого кода для рецепта из его id в base62.
+        Код дополняется до SHORT_LINK_CODE_LENGTH символов, поэтому
+        не пересекается со старыми случайными кодами из 3-4 символов.
+        """
+        code = ''
+        while pk:
+            pk, remainder = divmod(pk, len(BASE62_ALPHABET))
+            code = BASE62_ALPHABET[remainder] + code
+        return code.rjust(SHORT_LINK_CODE_LENGTH, BASE62_ALPHABET[0])
 
     def save(self, *args, **kwargs):
-        if not self.short_link_code:
-            self.short_link_code = self.generate_short_link_code()
         super().save(*args, **kwargs)
+        if not self.short_link_code:
+            self.short_link_code = self.generate_short_link_code(self.pk)
+            Recipe.objects.filter(pk=self.pk).update(
+                short_link_code=self.short_link_code
+            )
 
     def __str__(self):
         return f'Рецепт - {self.name}'
@@ -136,11 +208,11 @@ class RecipeIngredient(models.Model):
         'Количество',
         validators=[
             MinValueValidator(
-                COOKING_MIN_TIME,
+                INGREDIENT_MIN_AMOUNT,
                 message=f'Укажите число больше {INGREDIENT_MIN_AMOUNT}'
             ),
             MaxValueValidator(
-                COOKING_MAX_TIME,
+                INGREDIENT_MAX_AMOUNT,
                 message=f'Укажите число меньше {INGREDIENT_MAX_AMOUNT}'
             )
         ],
@@ -153,12 +225,18 @@ class RecipeIngredient(models.Model):
             models.UniqueConstraint(
                 fields=['ingredient', 'recipe'],
                 name='unique_ingredient'
+            ),
+            models.CheckConstraint(
+                check=Q(amount__range=(
+                    INGREDIENT_MIN_AMOUNT, INGREDIENT_MAX_AMOUNT
+                )),
+                name='recipe_ingredient_amount_range'
             )
         ]
 
     def __str__(self):
         return (
-            f'{self.ingredient.name} — {self.amount}'
+            f'{self.ingredient.name} — {self.amount} '
             f'{self.ingredient.measurement_unit}'
         )
 
@@ -0,0 +1,14 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.constants import SHORT_LINK_CACHE_KEY
+from recipes.models import Recipe
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_short_link_cache(sender, instance, **kwargs):
+    """Сбрасывает закэшированный id рецепта для его короткой ссылки."""
+    if instance.short_link_code:
+        cache.delete(SHORT_LINK_CACHE_KEY.format(instance.short_link_code))
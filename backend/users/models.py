@@ -1,9 +1,17 @@
-from django.contrib.auth.models import AbstractUser
-from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 from django.db.models import F, Q
+from django.db.models.functions import Upper
 
 from core.constants import LENGTH_NAME
+from users.validators import validate_username
+
+
+class CaseInsensitiveEmailUserManager(UserManager):
+    """Менеджер пользователей с поиском по email без учета регистра."""
+
+    def get_by_natural_key(self, email):
+        return self.get(email__iexact=email)
 
 
 class User(AbstractUser):
@@ -13,7 +21,7 @@ class User(AbstractUser):
         'Имя пользователя',
         max_length=LENGTH_NAME,
         unique=True,
-        validators=[UnicodeUsernameValidator]
+        validators=[validate_username]
     )
     first_name = models.CharField(
         'Имя',
@@ -31,10 +39,19 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
+    objects = CaseInsensitiveEmailUserManager()
+
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ('username',)
+        constraints = [
+            # UPPER, а не LOWER: именно так iexact строит запрос
+            # в PostgreSQL, поэтому вход по email использует этот индекс.
+            models.UniqueConstraint(
+                Upper('email'), name='user_email_upper_uniq'
+            )
+        ]
 
     def __str__(self):
         return self.username
@@ -0,0 +1,21 @@
+import re
+
+from django.core.exceptions import ValidationError
+
+from core.constants import RESTRICTED_USERNAME
+
+USERNAME_PATTERN = re.compile(r'\A[\w.@+-]+\Z')
+
+
+def validate_username(value):
+    """Проверяет допустимые символы и зарезервированные имена."""
+    if value.casefold() in RESTRICTED_USERNAME:
+        raise ValidationError(
+            f'Имя пользователя "{value}" недоступно для регистрации.'
+        )
+    if not USERNAME_PATTERN.match(value):
+        raise ValidationError(
+            'Имя пользователя может содержать только буквы, цифры '
+            'и символы @/./+/-/_.'
+        )
+    return value